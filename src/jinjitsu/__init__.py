@@ -1,28 +1,27 @@
 from __future__ import annotations
 
 import argparse
-import configparser
+import functools
 import importlib
 import importlib.util
-import json
-from pathlib import Path
+import itertools
+import os
+from pathlib import Path, PurePath
+import re
+import stat
 import sys
-from typing import Any, Dict, Iterable, Mapping, Sequence
-
-from jinja2 import (
-    ChainableUndefined,
-    ChoiceLoader,
-    DebugUndefined,
-    DictLoader,
-    Environment,
-    FileSystemLoader,
-    StrictUndefined,
-    Undefined,
-    select_autoescape,
-)
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Mapping, NamedTuple, Sequence
+
+if TYPE_CHECKING:  # pragma: no cover
+    from jinja2 import Environment
+
+# jinja2, json and configparser are imported where they are used so that
+# --help, argument errors and other early exits do not pay their import cost.
 
 DEFAULT_AUTOESCAPE_EXTS: tuple[str, ...] = ("html", "htm", "xml", "xhtml")
 STDIN_TEMPLATE_BASENAME = "__stdin__"
+OUTPUT_BUFFER_SIZE = 1 << 20
 _NEWLINE_TOKENS: dict[str, str] = {
     "\\n": "\n",
     "\\r\\n": "\r\n",
@@ -37,15 +36,92 @@ _NEWLINE_TOKENS: dict[str, str] = {
     "\r\n": "\r\n",
     "\r": "\r",
 }
+# jinja2 class names per --undefined choice, looked up once jinja2 is imported.
+_UNDEFINED_TYPES: dict[str, str] = {
+    "strict": "StrictUndefined",
+    "default": "Undefined",
+    "debug": "DebugUndefined",
+    "chain": "ChainableUndefined",
+}
+# Arguments that shape the Jinja environment; together with the loader they key the
+# environment cache.
+_ENVIRONMENT_OPTIONS: tuple[str, ...] = (
+    "autoescape",
+    "autoescape_exts",
+    "undefined",
+    "trim_blocks",
+    "lstrip_blocks",
+    "keep_trailing_newline",
+    "newline_sequence",
+    "auto_reload",
+    "cache_size",
+    "bytecode_cache",
+)
+# Templates made of a single "{{ name }}" are rendered without compiling them.
+_SINGLE_VARIABLE_TEMPLATE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}(\r\n|\n|\r)?")
+# Names Jinja parses as literals or special references rather than context lookups.
+_NON_VARIABLE_NAMES = frozenset({"true", "false", "none", "True", "False", "None", "not", "self"})
+
+# Attributes set by the import system rather than by the module's own code.
+_MODULE_INTERNALS = frozenset(
+    {"__builtins__", "__cached__", "__file__", "__loader__", "__name__", "__package__", "__spec__"}
+)
 
+# sys.modules names of loaded --module files, mapped to the (mtime_ns, size) they were
+# executed at; a file that changed since is executed again into the same slot.
+_LOADED_MODULES: dict[str, tuple[int, int]] = {}
 
-class CLIError(Exception):
-    """Raised when CLI invariants are violated."""
+
+# Parsed vars files by (absolute path, mtime_ns, size). Only formats that are slower to
+# parse than to deep-copy are cached; a None value marks a file seen once so far.
+_CACHED_VARS_EXTS = frozenset({".yaml", ".yml", ".toml"})
+_VARS_CACHE: dict[tuple[str, int, int], Dict[str, Any] | None] = {}
+_VARS_CACHE_SIZE = 64
 
 
-__all__ = ["main", "run", "execute"]
+class CLIError(Exception):
+    """Raised when CLI invariants are violated."""
 
 
+__all__ = ["main", "run", "execute", "execute_config", "unload_modules", "Config"]
+
+
+class Config(NamedTuple):
+    """Options for ``execute_config``; ``from_args`` builds one from parsed CLI arguments."""
+
+    template: str | None = None
+    stdin: bool = False
+    cli_vars: tuple[tuple[str, str], ...] = ()
+    vars_files: tuple[str, ...] = ()
+    modules: tuple[str, ...] = ()
+    searchpath: tuple[str, ...] = ()
+    autoescape: str = "smart"
+    autoescape_exts: tuple[str, ...] = DEFAULT_AUTOESCAPE_EXTS
+    undefined: str = "strict"
+    trim_blocks: bool = False
+    lstrip_blocks: bool = False
+    keep_trailing_newline: bool = False
+    newline_sequence: str = "\n"
+    auto_reload: bool = True
+    cache_size: int = 400
+    bytecode_cache: str | None = None
+    output: str | None = None
+    traceback: bool = False
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> Config:
+        values = {}
+        for name, default in cls._field_defaults.items():
+            value = getattr(args, name, None)
+            if value is None:
+                # Options left unset on the command line (such as --auto-reload) or
+                # missing from a hand-built Namespace.
+                value = default
+            values[name] = tuple(value) if isinstance(value, list) else value
+        return cls(**values)
+
+
+@functools.lru_cache(maxsize=1)
 def build_parser() -> argparse.ArgumentParser:
     description = "Render a Jinja template."
     examples = """\
@@ -81,6 +157,7 @@ Examples:
         dest="cli_vars",
         action="append",
         default=[],
+        type=parse_key_value,
         metavar="KEY=VALUE",
         help="Set a string variable (can repeat). Highest precedence.",
     )
@@ -120,12 +197,14 @@ Examples:
     )
     behavior_group.add_argument(
         "--autoescape-exts",
+        type=parse_autoescape_exts,
+        default=DEFAULT_AUTOESCAPE_EXTS,
         metavar="EXT,EXT",
         help="Override extensions used by smart autoescape (default: html,htm,xml,xhtml).",
     )
     behavior_group.add_argument(
         "--undefined",
-        choices=("strict", "default", "debug", "chain"),
+        choices=tuple(_UNDEFINED_TYPES),
         default="strict",
         help="How to handle missing variables.",
     )
@@ -146,6 +225,7 @@ Examples:
     )
     behavior_group.add_argument(
         "--newline-sequence",
+        type=parse_newline_sequence,
         default="\\n",
         metavar="{\\n,\\r\\n,\\r}",
         help=(
@@ -154,6 +234,26 @@ Examples:
             " use $'\\r\\n' to avoid literal backslashes."
         ),
     )
+    behavior_group.add_argument(
+        "--auto-reload",
+        action=argparse.BooleanOptionalAction,
+        help=(
+            "Check templates for changes before reusing a compiled copy. Off for the jinjitsu"
+            " command, where a single run never sees a template change; on for jinjitsu.run()."
+        ),
+    )
+    behavior_group.add_argument(
+        "--cache-size",
+        type=int,
+        default=400,
+        metavar="N",
+        help="Number of compiled templates to keep in memory (default: 400; 0 disables, -1 unlimited).",
+    )
+    behavior_group.add_argument(
+        "--bytecode-cache",
+        metavar="DIR",
+        help="Cache compiled templates in DIR to skip re-parsing them on later runs (created if missing).",
+    )
 
     output_group = parser.add_argument_group("Output and diagnostics")
     output_group.add_argument(
@@ -174,58 +274,124 @@ Examples:
 def parse_key_value(pair: str) -> tuple[str, str]:
     key, sep, value = pair.partition("=")
     if not sep:
-        raise CLIError(f"Expected KEY=VALUE for --var, got: {pair!r}")
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got: {pair!r}")
     if not key:
-        raise CLIError("Variable key cannot be empty.")
+        raise argparse.ArgumentTypeError("variable key cannot be empty")
     return key, value
 
 
-def parse_autoescape_exts(raw: str | None) -> tuple[str, ...]:
-    if raw is None:
-        return DEFAULT_AUTOESCAPE_EXTS
+def parse_autoescape_exts(raw: str) -> tuple[str, ...]:
     parts = [segment.strip().lower() for segment in raw.split(",") if segment.strip()]
     if not parts:
-        raise CLIError("--autoescape-exts requires at least one extension.")
+        raise argparse.ArgumentTypeError("requires at least one extension")
     return tuple(parts)
 
 
 def parse_newline_sequence(value: str) -> str:
-    if value in _NEWLINE_TOKENS:
-        return _NEWLINE_TOKENS[value]
-    raise CLIError("--newline-sequence accepts one of \\n, \\r\\n, or \\r (also CR/LF/CRLF).")
+    sequence = _NEWLINE_TOKENS.get(value)
+    if sequence is None:
+        raise argparse.ArgumentTypeError("accepts one of \\n, \\r\\n, or \\r (also CR/LF/CRLF)")
+    return sequence
+
 
+def _stat_or_raise(path: Path, kind: str) -> os.stat_result:
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise CLIError(f"{kind} not found: {path}") from None
 
-def ensure_existing_file(path: Path, kind: str) -> None:
-    if not path.exists():
-        raise CLIError(f"{kind} not found: {path}")
-    if path.is_dir():
+
+def ensure_existing_file(path: Path, kind: str) -> os.stat_result:
+    stat_result = _stat_or_raise(path, kind)
+    if stat.S_ISDIR(stat_result.st_mode):
         raise CLIError(f"{kind} must be a file: {path}")
+    return stat_result
+
 
+def _expand(raw: str) -> str:
+    return os.path.expanduser(raw) if raw.startswith("~") else raw
 
-def ensure_existing_directory(path: Path) -> None:
-    if not path.exists() or not path.is_dir():
+
+def _absolute(path: str) -> str:
+    # abspath() skips the stat calls of realpath() but collapses ".." textually, which
+    # differs from what the OS opens when ".." follows a symlinked directory.
+    if os.pardir in PurePath(path).parts:
+        return os.path.realpath(path)
+    return os.path.abspath(path)
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_directory(path: str) -> str:
+    try:
+        is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+    except OSError:
+        is_dir = False
+    if not is_dir:
         raise CLIError(f"Search path must be an existing directory: {path}")
+    return os.path.realpath(path)
 
 
 def load_module_variables(paths: Sequence[str]) -> list[Dict[str, Any]]:
     variables: list[Dict[str, Any]] = []
-    for index, raw_path in enumerate(paths):
-        module_path = Path(raw_path).expanduser()
-        ensure_existing_file(module_path, "Module")
-        module_name = f"_jinjitsu_module_{index}_{module_path.stem}"
-        spec = importlib.util.spec_from_file_location(module_name, module_path)
-        if spec is None or spec.loader is None:
-            raise CLIError(f"Unable to import module from {module_path}")
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        try:
-            spec.loader.exec_module(module)
-        except Exception as exc:  # noqa: BLE001
-            raise CLIError(f"Failed to load module {module_path}: {exc}") from exc
-        variables.append(dict(module.__dict__))
+    for raw_path in paths:
+        module_path = Path(_expand(raw_path))
+        stat_result = ensure_existing_file(module_path, "Module")
+        module_name = _module_name_for(_absolute(str(module_path)))
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        module = sys.modules.get(module_name)
+        if module is None or _LOADED_MODULES.get(module_name) != signature:
+            module = _exec_module(module_name, module_path)
+            _LOADED_MODULES[module_name] = signature
+        variables.append(
+            {key: value for key, value in module.__dict__.items() if key not in _MODULE_INTERNALS}
+        )
     return variables
 
 
+def _module_name_for(module_path: str) -> str:
+    import hashlib
+
+    return "_jinjitsu_module_" + hashlib.sha1(module_path.encode(), usedforsecurity=False).hexdigest()
+
+
+def _exec_module(module_name: str, module_path: Path) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    if spec is None or spec.loader is None:
+        raise CLIError(f"Unable to import module from {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception as exc:  # noqa: BLE001
+        sys.modules.pop(module_name, None)
+        _LOADED_MODULES.pop(module_name, None)
+        raise CLIError(f"Failed to load module {module_path}: {exc}") from exc
+    return module
+
+
+def unload_modules() -> None:
+    """Drop every ``--module`` file loaded so far from ``sys.modules``."""
+    for module_name in _LOADED_MODULES:
+        sys.modules.pop(module_name, None)
+    _LOADED_MODULES.clear()
+
+
+def _load_json(raw: bytes) -> Mapping[str, Any]:
+    return _json_loads()(raw)
+
+
+@functools.cache
+def _json_loads() -> Callable[[bytes], Any]:
+    # Resolved once so a missing orjson is not searched for on every parse.
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        import json
+
+        return json.loads
+    return orjson.loads
+
+
 def _load_yaml(text: str, path: Path) -> Mapping[str, Any]:
     try:
         import yaml  # type: ignore
@@ -273,7 +439,9 @@ def _load_toml(text: str, path: Path) -> Mapping[str, Any]:
 
 
 def _load_ini(text: str) -> Mapping[str, dict[str, str]]:
-    parser = configparser.ConfigParser()
+    import configparser
+
+    parser = configparser.ConfigParser(interpolation=None)
     parser.optionxform = str
     parser.read_string(text)
     data: dict[str, dict[str, str]] = {"DEFAULT": dict(parser.defaults())}
@@ -283,18 +451,42 @@ def _load_ini(text: str) -> Mapping[str, dict[str, str]]:
 
 
 def load_vars_file(path: str) -> Dict[str, Any]:
-    file_path = Path(path).expanduser()
-    ensure_existing_file(file_path, "Vars file")
-    text = file_path.read_text(encoding="utf-8")
+    file_path = Path(_expand(path))
+    stat_result = ensure_existing_file(file_path, "Vars file")
+    if file_path.suffix.lower() not in _CACHED_VARS_EXTS:
+        return _parse_vars_file(file_path)
+
+    import copy
+
+    # Keyed on mtime and size so repeated runs reuse the parse until the file changes.
+    key = (_absolute(str(file_path)), stat_result.st_mtime_ns, stat_result.st_size)
+    cached = _VARS_CACHE.get(key)
+    if cached is not None:
+        # Templates may mutate nested values; each run gets its own copy.
+        return copy.deepcopy(cached)
+    data = _parse_vars_file(file_path)
+    if key in _VARS_CACHE:
+        # Second load of an unchanged file: keep a private copy for the runs that follow.
+        _VARS_CACHE[key] = copy.deepcopy(data)
+    else:
+        # The first load hands out the parse itself, so one-shot runs never copy.
+        if len(_VARS_CACHE) >= _VARS_CACHE_SIZE:
+            del _VARS_CACHE[next(iter(_VARS_CACHE))]
+        _VARS_CACHE[key] = None
+    return data
+
+
+def _parse_vars_file(file_path: Path) -> Dict[str, Any]:
+    raw = file_path.read_bytes()
     ext = file_path.suffix.lower()
     if ext == ".json":
-        data = json.loads(text)
+        data = _load_json(raw)
     elif ext in {".yaml", ".yml"}:
-        data = _load_yaml(text, file_path)
+        data = _load_yaml(raw.decode("utf-8"), file_path)
     elif ext == ".toml":
-        data = _load_toml(text, file_path)
+        data = _load_toml(raw.decode("utf-8"), file_path)
     elif ext == ".ini":
-        data = _load_ini(text)
+        data = _load_ini(raw.decode("utf-8"))
     else:
         raise CLIError(f"Unsupported vars file type for {file_path}.")
 
@@ -311,23 +503,18 @@ def assemble_context(
     cli_vars: Iterable[tuple[str, str]],
 ) -> Dict[str, Any]:
     context: Dict[str, Any] = {}
-    for payload in module_vars:
+    for payload in itertools.chain(module_vars, vars_files):
         context.update(payload)
-    for payload in vars_files:
-        context.update(payload)
-    for key, value in cli_vars:
-        context[key] = value
+    context.update(cli_vars)
     return context
 
 
 def resolve_search_paths(template_dir: Path | None, extra_paths: Sequence[str]) -> list[str]:
     resolved: list[str] = []
     if template_dir is not None:
-        resolved.append(str(template_dir.resolve()))
+        resolved.append(_absolute(str(template_dir)))
     for raw in extra_paths:
-        path = Path(raw).expanduser()
-        ensure_existing_directory(path)
-        resolved.append(str(path.resolve()))
+        resolved.append(_resolve_directory(_absolute(_expand(raw))))
     if not resolved:
         resolved.append(str(Path.cwd()))
     return resolved
@@ -337,29 +524,18 @@ def determine_stdin_template_name(output: str | None, autoescape_exts: Sequence[
     ext = "txt"
     if output and output != "-":
         candidate = Path(output).suffix.lstrip(".").lower()
-        if candidate and candidate in set(autoescape_exts):
+        if candidate and candidate in autoescape_exts:
             ext = candidate
     return f"{STDIN_TEMPLATE_BASENAME}.{ext}"
 
 
-def select_undefined(name: str):
-    mapping = {
-        "strict": StrictUndefined,
-        "default": Undefined,
-        "debug": DebugUndefined,
-        "chain": ChainableUndefined,
-    }
-    return mapping[name]
-
+def build_environment(loader, config: Config) -> Environment:
+    import jinja2
+    from jinja2 import Environment, FileSystemBytecodeCache, select_autoescape
 
-def build_environment(
-    loader,
-    args,
-    autoescape_exts: Sequence[str],
-) -> Environment:
-    if args.autoescape == "smart":
-        autoescape = select_autoescape(autoescape_exts)
-    elif args.autoescape == "on":
+    if config.autoescape == "smart":
+        autoescape = select_autoescape(config.autoescape_exts)
+    elif config.autoescape == "on":
         autoescape = True
     else:
         autoescape = False
@@ -367,67 +543,198 @@ def build_environment(
     env_kwargs = dict(
         loader=loader,
         autoescape=autoescape,
-        undefined=select_undefined(args.undefined),
-        trim_blocks=args.trim_blocks,
-        lstrip_blocks=args.lstrip_blocks,
-        keep_trailing_newline=args.keep_trailing_newline,
-        newline_sequence=args.newline_sequence,
+        undefined=getattr(jinja2, _UNDEFINED_TYPES[config.undefined]),
+        trim_blocks=config.trim_blocks,
+        lstrip_blocks=config.lstrip_blocks,
+        keep_trailing_newline=config.keep_trailing_newline,
+        newline_sequence=config.newline_sequence,
+        auto_reload=config.auto_reload,
+        cache_size=config.cache_size,
     )
+    if config.bytecode_cache:
+        cache_dir = Path(config.bytecode_cache).expanduser()
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        env_kwargs["bytecode_cache"] = FileSystemBytecodeCache(directory=str(cache_dir))
     return Environment(**env_kwargs)
 
 
-def render_template(env: Environment, template_name: str, context: Mapping[str, Any]) -> str:
+def get_environment(
+    config: Config,
+    searchpaths: Sequence[str],
+    stdin_template: tuple[str, str] | None = None,
+) -> Environment:
+    options = {name: getattr(config, name) for name in _ENVIRONMENT_OPTIONS}
+    return _cached_environment(tuple(searchpaths), stdin_template, **options)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_environment(
+    searchpaths: tuple[str, ...],
+    stdin_template: tuple[str, str] | None,
+    **options: Any,
+) -> Environment:
+    # One environment per option set and loader layout, so repeated runs in the
+    # same process share Jinja's compiled-template cache instead of rebuilding it.
+    from jinja2 import ChoiceLoader, DictLoader, FileSystemLoader
+
+    loader = FileSystemLoader(searchpaths)
+    if stdin_template is not None:
+        template_name, template_source = stdin_template
+        loader = ChoiceLoader([DictLoader({template_name: template_source}), loader])
+    return build_environment(loader, Config(**options))
+
+
+def render_template(
+    env: Environment,
+    template_name: str,
+    context: Mapping[str, Any],
+    source: str | None = None,
+) -> Iterator[str]:
+    if source is not None:
+        match = _SINGLE_VARIABLE_TEMPLATE.fullmatch(source)
+        if match is not None and match.group(1) not in _NON_VARIABLE_NAMES:
+            return iter(_render_single_variable(env, template_name, context, match))
     template = env.get_template(template_name)
-    return template.render(context)
+    return template.generate(context)
+
+
+def _render_single_variable(
+    env: Environment,
+    template_name: str,
+    context: Mapping[str, Any],
+    match: re.Match[str],
+) -> list[str]:
+    # Mirrors what Jinja would produce for a lone "{{ name }}": context first, then
+    # globals, then the configured Undefined; the output is escaped when autoescape
+    # applies and one trailing newline follows Jinja's keep_trailing_newline rule.
+    name, trailing_newline = match.groups()
+    if name in context:
+        value = context[name]
+    elif name in env.globals:
+        value = env.globals[name]
+    else:
+        value = env.undefined(name=name)
+    autoescape = env.autoescape(template_name) if callable(env.autoescape) else env.autoescape
+    if autoescape:
+        from markupsafe import escape
 
+        rendered = str(escape(value))
+    else:
+        rendered = str(value)
+    if trailing_newline and env.keep_trailing_newline:
+        return [rendered, env.newline_sequence]
+    return [rendered]
 
-def write_output(output: str | None, rendered: str) -> None:
+
+def write_output(output: str | None, chunks: Iterable[str]) -> None:
+    encoded = (chunk.encode("utf-8") for chunk in chunks)
     if output is None or output == "-":
-        sys.stdout.write(rendered)
+        stream = getattr(sys.stdout, "buffer", None)
+        if stream is None:
+            sys.stdout.writelines(chunks)
+            return
+        sys.stdout.flush()
+        stream.writelines(encoded)
+        stream.flush()
         return
-    output_path = Path(output).expanduser()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(rendered, encoding="utf-8")
+    output_path = Path(_expand(output))
+    try:
+        stat_result = os.lstat(output_path)
+    except FileNotFoundError:
+        stat_result = None
+    if stat_result is not None and stat.S_ISREG(stat_result.st_mode) and stat_result.st_nlink == 1:
+        if _replace_output(output_path, encoded, stat.S_IMODE(stat_result.st_mode)):
+            return
+    if stat_result is None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Symlinks, hard links, devices and files in read-only directories are written in
+    # place so the path keeps pointing where it did.
+    try:
+        with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as handle:
+            handle.writelines(encoded)
+    except BaseException:
+        if stat_result is None:
+            # Do not leave a half-rendered file behind when rendering fails midway.
+            output_path.unlink(missing_ok=True)
+        raise
+
+
+def _replace_output(output_path: Path, encoded: Iterable[bytes], mode: int) -> bool:
+    # Render into a sibling temp file and swap it in only once rendering succeeded, so a
+    # failed render leaves the existing output untouched. Returns False when the
+    # directory does not allow creating the temp file.
+    import tempfile
+
+    try:
+        handle = tempfile.NamedTemporaryFile(
+            dir=output_path.parent,
+            prefix=f".{output_path.name}.",
+            suffix=".tmp",
+            delete=False,
+            buffering=OUTPUT_BUFFER_SIZE,
+        )
+    except PermissionError:
+        return False
+    try:
+        with handle:
+            handle.writelines(encoded)
+        os.chmod(handle.name, mode)
+        os.replace(handle.name, output_path)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return True
+
+
+def read_stdin() -> str:
+    stream = getattr(sys.stdin, "buffer", None)
+    if stream is None:
+        return sys.stdin.read()
+    return stream.read().decode("utf-8")
 
 
 def execute(args: argparse.Namespace) -> int:
-    if args.stdin and args.template:
+    return execute_config(Config.from_args(args))
+
+
+def execute_config(config: Config) -> int:
+    if config.stdin and config.template:
         raise CLIError("TEMPLATE positional argument and --stdin are mutually exclusive.")
-    if not args.stdin and not args.template:
+    if not config.stdin and not config.template:
         raise CLIError("Provide a TEMPLATE path or use --stdin.")
 
-    autoescape_exts = parse_autoescape_exts(args.autoescape_exts)
-
-    module_payloads = load_module_variables(args.modules)
-    vars_payloads = [load_vars_file(path) for path in args.vars_files]
-    cli_payloads = [parse_key_value(pair) for pair in args.cli_vars]
-    context = assemble_context(module_payloads, vars_payloads, cli_payloads)
-    args.newline_sequence = parse_newline_sequence(args.newline_sequence)
-
-    if args.stdin:
-        template_source = sys.stdin.read()
-        template_name = determine_stdin_template_name(args.output, autoescape_exts)
-        searchpaths = resolve_search_paths(None, args.searchpath)
-        dict_loader = DictLoader({template_name: template_source})
-        fs_loader = FileSystemLoader(searchpaths)
-        loader = ChoiceLoader([dict_loader, fs_loader])
+    module_payloads = load_module_variables(config.modules)
+    vars_payloads = [load_vars_file(path) for path in config.vars_files]
+    context = assemble_context(module_payloads, vars_payloads, config.cli_vars)
+
+    template_source: str | None = None
+    if config.stdin:
+        template_source = read_stdin()
+        template_name = determine_stdin_template_name(config.output, config.autoescape_exts)
+        searchpaths = resolve_search_paths(None, config.searchpath)
+        env = get_environment(config, searchpaths, (template_name, template_source))
     else:
-        template_path = Path(args.template).expanduser()
+        template_path = Path(_expand(config.template))
         ensure_existing_file(template_path, "Template")
         template_dir = template_path.parent
-        searchpaths = resolve_search_paths(template_dir, args.searchpath)
-        loader = FileSystemLoader(searchpaths)
+        searchpaths = resolve_search_paths(template_dir, config.searchpath)
+        env = get_environment(config, searchpaths)
         template_name = template_path.name
 
-    env = build_environment(loader, args, autoescape_exts)
-    rendered = render_template(env, template_name, context)
-    write_output(args.output, rendered)
+    chunks = render_template(env, template_name, context, template_source)
+    write_output(config.output, chunks)
     return 0
 
 
 def run(argv: Sequence[str] | None = None) -> int:
+    return _run(argv, auto_reload=True)
+
+
+def _run(argv: Sequence[str] | None, auto_reload: bool) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    if args.auto_reload is None:
+        args.auto_reload = auto_reload
     try:
         return execute(args)
     except CLIError as exc:
@@ -441,7 +748,8 @@ def run(argv: Sequence[str] | None = None) -> int:
 
 
 def main(argv: Sequence[str] | None = None) -> int:
-    return run(argv)
+    # The console script renders once and exits, so templates cannot change under it.
+    return _run(argv, auto_reload=False)
 
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import argparse
 import os
 import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
+import jinjitsu
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 
 
@@ -119,3 +124,236 @@ def test_newline_sequence_crlf(tmp_path: Path) -> None:
 
     assert result.returncode == 0, result.stderr
     assert output_path.read_bytes() == b"line1\r\nline2\r\n"
+
+
+def test_bytecode_cache_reused_across_runs(tmp_path: Path) -> None:
+    template_path = tmp_path / "template.txt"
+    template_path.write_text("Hello {{ name }}")
+    cache_dir = tmp_path / "cache"
+
+    for _ in range(2):
+        result = run_cli(
+            [str(template_path), "-D", "name=World", "--bytecode-cache", str(cache_dir)],
+            cwd=tmp_path,
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout == "Hello World"
+
+    assert len(list(cache_dir.glob("*.cache"))) == 1
+
+
+def test_render_error_leaves_no_output_file(tmp_path: Path) -> None:
+    output_path = tmp_path / "out.txt"
+    result = run_cli(
+        ["--stdin", "-o", str(output_path)],
+        stdin="{% for i in range(3) %}line {{ i }}\n{% endfor %}{{ missing }}",
+        cwd=tmp_path,
+    )
+
+    assert result.returncode == 1
+    assert "'missing' is undefined" in result.stderr
+    assert not output_path.exists()
+
+
+def test_invalid_var_is_rejected_before_loading_sources(tmp_path: Path) -> None:
+    module_path = tmp_path / "extras.py"
+    module_path.write_text("raise RuntimeError('module should not be imported')")
+
+    result = run_cli(
+        ["--stdin", "-m", str(module_path), "-D", "novalue"],
+        stdin="{{ novalue }}",
+        cwd=tmp_path,
+    )
+
+    assert result.returncode == 2
+    assert "argument -D/--var: expected KEY=VALUE, got: 'novalue'" in result.stderr
+
+
+def test_ini_vars_values_are_literal(tmp_path: Path) -> None:
+    vars_path = tmp_path / "vars.ini"
+    vars_path.write_text("[DEFAULT]\nowner = ops\n\n[build]\nprogress = 100%\nlabel = %(owner)s\n")
+
+    result = run_cli(
+        [
+            "--stdin",
+            "--vars",
+            str(vars_path),
+        ],
+        stdin="{{ build.progress }} {{ build.label }} {{ build.owner }} {{ DEFAULT.owner }}",
+        cwd=tmp_path,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "100% %(owner)s ops ops"
+
+
+def test_stdin_single_variable_matches_jinja_semantics(tmp_path: Path) -> None:
+    result = run_cli(["--stdin", "--keep-trailing-newline", "-D", "name=World"], stdin="{{ name }}\n", cwd=tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "World\n"
+
+    result = run_cli(["--stdin"], stdin="{{ missing }}", cwd=tmp_path)
+    assert result.returncode == 1
+    assert "'missing' is undefined" in result.stderr
+
+
+def test_render_error_keeps_existing_output_file(tmp_path: Path) -> None:
+    output_path = tmp_path / "out.txt"
+    output_path.write_text("old")
+    result = run_cli(["--stdin", "-o", str(output_path)], stdin="new {{ missing }}", cwd=tmp_path)
+
+    assert result.returncode == 1
+    assert output_path.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [output_path]
+
+
+def test_parent_reference_follows_symlinked_directory(tmp_path: Path) -> None:
+    (tmp_path / "real" / "sub").mkdir(parents=True)
+    (tmp_path / "link").symlink_to(tmp_path / "real" / "sub")
+    (tmp_path / "real" / "t.j2").write_text("REAL {{ source }}")
+    (tmp_path / "real" / "vars.json").write_text('{"source": "real"}')
+    (tmp_path / "t.j2").write_text("WRONG {{ source }}")
+    (tmp_path / "vars.json").write_text('{"source": "wrong"}')
+
+    result = run_cli(["link/../t.j2", "--vars", "link/../vars.json"], cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "REAL real"
+
+
+def test_modules_with_similar_names_are_loaded_separately(tmp_path: Path) -> None:
+    dash_path = tmp_path / "a-b.py"
+    underscore_path = tmp_path / "a_b.py"
+    dash_path.write_text("value = 'dash'\n")
+    underscore_path.write_text("value = 'undr'\n")
+    os.utime(underscore_path, ns=(dash_path.stat().st_atime_ns, dash_path.stat().st_mtime_ns))
+
+    result = run_cli(["--stdin", "-m", str(dash_path), "-m", str(underscore_path)], stdin="{{ value }}", cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "undr"
+
+
+@pytest.mark.parametrize(
+    ("name", "content"),
+    [
+        ("vars.json", '{"items": [1]}'),
+        pytest.param(
+            "vars.toml",
+            "items = [1]\n",
+            marks=pytest.mark.skipif(sys.version_info < (3, 11), reason="tomllib requires Python 3.11"),
+        ),
+    ],
+)
+def test_vars_file_values_are_fresh_per_run(tmp_path: Path, capsys, name: str, content: str) -> None:
+    template_path = tmp_path / "m.j2"
+    template_path.write_text('{{ items.append(2) or "" }}{{ items }}')
+    vars_path = tmp_path / name
+    vars_path.write_text(content)
+
+    for _ in range(3):
+        assert jinjitsu.run([str(template_path), "--vars", str(vars_path)]) == 0
+        assert capsys.readouterr().out == "[1, 2]"
+
+
+def test_run_picks_up_template_changes(tmp_path: Path, capsys) -> None:
+    template_path = tmp_path / "st.j2"
+    template_path.write_text("v1")
+    assert jinjitsu.run([str(template_path)]) == 0
+    assert capsys.readouterr().out == "v1"
+
+    template_path.write_text("v2")
+    mtime_ns = template_path.stat().st_mtime_ns + 2_000_000_000
+    os.utime(template_path, ns=(mtime_ns, mtime_ns))
+    assert jinjitsu.run([str(template_path)]) == 0
+    assert capsys.readouterr().out == "v2"
+
+
+def test_execute_config_renders_without_argparse(tmp_path: Path) -> None:
+    template_path = tmp_path / "page.html"
+    template_path.write_text("<p>{{ title }}</p>\n")
+    output_path = tmp_path / "out.html"
+
+    config = jinjitsu.Config(
+        template=str(template_path),
+        cli_vars=(("title", "A & B"),),
+        keep_trailing_newline=True,
+        output=str(output_path),
+    )
+
+    assert jinjitsu.execute_config(config) == 0
+    assert output_path.read_text() == "<p>A &amp; B</p>\n"
+
+
+def test_execute_accepts_partial_namespace(tmp_path: Path) -> None:
+    template_path = tmp_path / "t.txt"
+    template_path.write_text("{{ name }}")
+    output_path = tmp_path / "out.txt"
+    args = argparse.Namespace(template=str(template_path), cli_vars=[("name", "World")], output=str(output_path))
+
+    assert jinjitsu.execute(args) == 0
+    assert output_path.read_text() == "World"
+
+
+def test_changed_module_is_executed_again(tmp_path: Path) -> None:
+    module_path = tmp_path / "extras.py"
+    module_path.write_text("value = 1\n")
+    assert jinjitsu.load_module_variables([str(module_path)])[0]["value"] == 1
+    assert jinjitsu.load_module_variables([str(module_path)])[0]["value"] == 1
+
+    module_path.write_text("value = 'changed'\n")
+    assert jinjitsu.load_module_variables([str(module_path)])[0]["value"] == "changed"
+    jinjitsu.unload_modules()
+
+
+def test_unload_modules_releases_sys_modules_entry(tmp_path: Path) -> None:
+    module_path = tmp_path / "extras.py"
+    module_path.write_text("value = 1\n")
+    jinjitsu.load_module_variables([str(module_path)])
+    loaded = [name for name, module in sys.modules.items() if getattr(module, "__file__", None) == str(module_path)]
+    assert len(loaded) == 1
+
+    jinjitsu.unload_modules()
+
+    assert loaded[0] not in sys.modules
+
+
+def test_environment_is_shared_per_searchpath_and_options(tmp_path: Path) -> None:
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    config = jinjitsu.Config(template="t.j2")
+    env = jinjitsu.get_environment(config, [str(tmp_path)])
+
+    assert jinjitsu.get_environment(config, [str(tmp_path)]) is env
+    assert jinjitsu.get_environment(config, [str(other_dir)]) is not env
+    assert jinjitsu.get_environment(config._replace(trim_blocks=True), [str(tmp_path)]) is not env
+    assert jinjitsu.get_environment(config._replace(output="out.txt"), [str(tmp_path)]) is env
+
+
+def test_symlinked_output_updates_link_target(tmp_path: Path) -> None:
+    target_path = tmp_path / "real.txt"
+    target_path.write_text("old")
+    link_path = tmp_path / "out.txt"
+    link_path.symlink_to(target_path)
+
+    result = run_cli(["--stdin", "-o", str(link_path)], stdin="new", cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert link_path.is_symlink()
+    assert target_path.read_text() == "new"
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/fd/1"), reason="/dev/fd is not available")
+def test_output_to_file_descriptor_path(tmp_path: Path) -> None:
+    result = run_cli(["--stdin", "-o", "/dev/fd/1", "-D", "n=1"], stdin="hi {{ n }}", cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == "hi 1"
+
+
+def test_render_error_on_stdout_keeps_streamed_output(tmp_path: Path) -> None:
+    result = run_cli(["--stdin"], stdin="A{% for i in range(3) %}{{ i }}{% endfor %}{{ missing }}", cwd=tmp_path)
+
+    assert result.returncode == 1
+    assert result.stdout == "A012"
+    assert "'missing' is undefined" in result.stderr